@@ -1,9 +1,11 @@
 from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Optional
-from scraper import NewsScraper
-from storage import Storage
+from scraper import NewsScraper, ScrapeAlreadyRunning, get_run_lock
+from storage import Storage, encode_cursor, encode_search_cursor
 import json
+import threading
+import uuid
 
 app = FastAPI(
     title="News Scraper API",
@@ -12,6 +14,9 @@ app = FastAPI(
 )
 
 storage = Storage()
+# Serializes the "is a run active? -> create job" check of concurrent /scrape-feeds calls
+_scrape_start_lock = threading.Lock()
+_scrape_thread = None
 
 # Pydantic Models for request/response validation
 class ArticlePreview(BaseModel):
@@ -37,6 +42,20 @@ class ArticleDetail(BaseModel):
     success: bool
     scraped_at: str
 
+class SearchResult(BaseModel):
+    id: int
+    title: str
+    url: str
+    domain: str
+    published_date: Optional[str] = None
+    snippet: str
+    score: float
+
+class SearchResponse(BaseModel):
+    items: List[SearchResult]
+    page_size: int
+    next_cursor: Optional[str] = None
+
 class ScrapeResponse(BaseModel):
     start_time: str
     end_time: str
@@ -44,11 +63,33 @@ class ScrapeResponse(BaseModel):
     articles_new: int
     articles_skipped_duplicate: int
     articles_skipped_domain: int
+    feeds_not_modified: int = 0
+    http_requests: int = 0
+    http_connections_new: int = 0
+    http_connections_reused: int = 0
+    http_retries: int = 0
+    articles_failed: int = 0
+    job_id: Optional[str] = None
+
+class ScrapeJobResponse(BaseModel):
+    job_id: str
+    status: str
+    stage: Optional[str] = None
+    feeds_total: int = 0
+    feeds_done: int = 0
+    articles_new: int = 0
+    articles_failed: int = 0
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[ScrapeResponse] = None
+    error: Optional[str] = None
 
 class NewsListResponse(BaseModel):
     items: List[ArticlePreview]
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 # Endpoints
 
@@ -57,36 +98,114 @@ async def health_check():
     """Health check endpoint for Docker HEALTHCHECK."""
     return {"status": "healthy"}
 
-@app.post("/scrape-feeds", response_model=ScrapeResponse)
-async def scrape_feeds():
+def _run_scrape_job(job_id):
+    try:
+        NewsScraper().run(job_id=job_id)
+    except ScrapeAlreadyRunning as e:
+        storage.update_scrape_job(job_id, status='failed', error=str(e))
+    except Exception as e:
+        # NewsScraper.run has already recorded the failure in the job row
+        print(f"Scrape job {job_id} failed: {e}")
+
+def _job_response(job):
+    return ScrapeJobResponse(job_id=job['id'], **{key: value for key, value in job.items() if key != 'id'})
+
+@app.post("/scrape-feeds", response_model=ScrapeJobResponse, status_code=202)
+def scrape_feeds():
     """
-    Initiates the scraping process for all configured feeds.
+    Starts the scraping process for all configured feeds as a background job.
     
-    This endpoint runs synchronously and returns a summary of the execution
-    including the number of new articles, duplicates skipped, and domain duplicates.
+    Returns immediately with the job id; use /scrape-jobs/{job_id} to follow its
+    progress and get the summary (new articles, duplicates skipped, etc.) once it
+    completes. Only one run can be active at a time, including the cron-triggered one.
     """
+    global _scrape_thread
     try:
-        scraper = NewsScraper()
-        result = scraper.run()
-        return ScrapeResponse(**result)
+        with _scrape_start_lock:
+            # A job started here that has not taken the run lock yet, or any run
+            # (API or cron) currently holding it
+            if (_scrape_thread and _scrape_thread.is_alive()) or get_run_lock(storage).is_locked():
+                detail = "A scrape run is already in progress"
+                active_job = storage.get_active_scrape_job()
+                if active_job:
+                    detail += f" (job {active_job['id']})"
+                raise HTTPException(status_code=409, detail=detail)
+
+            job_id = uuid.uuid4().hex
+            storage.create_scrape_job(job_id)
+            _scrape_thread = threading.Thread(target=_run_scrape_job, args=(job_id,), daemon=True)
+            _scrape_thread.start()
+        return _job_response(storage.get_scrape_job(job_id))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
+@app.get("/scrape-jobs/{job_id}", response_model=ScrapeJobResponse)
+def get_scrape_job(job_id: str):
+    """
+    Returns the status and progress of a scrape job.
+    
+    Includes the current stage, feeds processed, new and failed articles and, once
+    completed, the run summary.
+    """
+    job = storage.get_scrape_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return _job_response(job)
+
 @app.get("/get-news-list", response_model=NewsListResponse)
-async def get_news_list(page: int = Query(1, ge=1), page_size: int = Query(10, ge=1, le=100)):
+async def get_news_list(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor")
+):
     """
     Returns a paginated list of news articles from today.
     
     Only returns articles that:
     - Are from today (based on published_date)
     - Have not been marked as used (used=False)
+
+    Pagination can use `page` or, for constant-time deep pages, the `next_cursor`
+    returned by the previous call (keyset pagination; `page` is then ignored).
     """
     try:
-        articles = storage.get_news_list(page=page, page_size=page_size)
-        return NewsListResponse(items=articles, page=page, page_size=page_size)
+        articles = storage.get_news_list(page=page, page_size=page_size, cursor=cursor)
+        next_cursor = encode_cursor(articles[-1]) if len(articles) == page_size else None
+        return NewsListResponse(items=articles, page=page, page_size=page_size, next_cursor=next_cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve news list: {str(e)}")
 
+@app.get("/search", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, description="Keywords; all of them must match (accent-insensitive)"),
+    date_from: Optional[str] = Query(None, description="First published day to include (YYYY-MM-DD, UTC)"),
+    date_to: Optional[str] = Query(None, description="Last published day to include (YYYY-MM-DD, UTC)"),
+    domain: Optional[str] = Query(None, description="Only articles from this domain, e.g. elpais.com"),
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor")
+):
+    """
+    Full-text search across title, summary, text and tags of all stored articles.
+    
+    Results are ranked by relevance (BM25, title matches weigh most) and include a
+    snippet with the matching terms wrapped in <b> tags.
+    """
+    try:
+        results = storage.search_articles(
+            q, date_from=date_from, date_to=date_to, domain=domain,
+            page_size=page_size, cursor=cursor
+        )
+        next_cursor = encode_search_cursor(results[-1]) if len(results) == page_size else None
+        return SearchResponse(items=results, page_size=page_size, next_cursor=next_cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
 @app.get("/read-full-news/{article_id}", response_model=ArticleDetail)
 async def read_full_news(article_id: int):
     """
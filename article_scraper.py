@@ -1,144 +1,216 @@
-import requests
 import trafilatura
-from bs4 import BeautifulSoup
+from trafilatura.utils import load_html
 import hashlib
 import os
 from urllib.parse import urljoin, urlparse
+from http_client import HttpClient
+
+def _class_xpath(class_name, tag='*'):
+    # XPath equivalent of the CSS selector "tag.class_name"
+    return f'//{tag}[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]'
+
+_worker_scraper = None
+
+def extract_article_html(html, url):
+    # Module-level entry point so extraction can run in a ProcessPoolExecutor worker
+    global _worker_scraper
+    if _worker_scraper is None:
+        _worker_scraper = ArticleScraper(download_images=False)
+    return _worker_scraper.extract_article(html, url)
 
 class ArticleScraper:
-    def __init__(self, user_agent=None, timeout=10, download_images=True):
+    def __init__(self, user_agent=None, timeout=10, download_images=True, http_client=None):
         self.user_agent = user_agent or 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         self.timeout = timeout
         self.download_images = download_images
-        self.headers = {'User-Agent': self.user_agent}
+        # Shared keep-alive session (with retries) unless the caller provides one
+        self.http_client = http_client or HttpClient(user_agent=self.user_agent, timeout=timeout)
         
         # Base directory for the project to ensure relative paths work
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
 
     def scrape_article(self, url):
+        # Single-threaded convenience path: fetch, extract and build in one call
+        fetched = self.fetch_article(url)
+        if not fetched['success']:
+            return fetched
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
+            extracted = self.extract_article(fetched['html'], url)
+        except Exception as e:
+            return self._error_result(url, e)
+        return self.build_article(url, extracted)
+
+    def fetch_article(self, url):
+        # Network stage: returns the raw HTML bytes, extraction happens separately
+        try:
+            response = self.http_client.get(url, timeout=self.timeout)
             response.raise_for_status()
-            html = response.text
-            
-            # 1. Title Extraction
-            title = self._extract_title(html)
-            
-            # 2. Main Content Extraction
-            content = trafilatura.extract(html, include_images=True)
-            if not content:
-                content = self._fallback_content_extraction(html)
-                
-            # 3. Main Image Extraction
-            image_url = self._extract_main_image(html, url)
-            local_image_path = None
-            if self.download_images and image_url:
-                local_image_path = self._download_image(image_url)
-                
             return {
                 'url': url,
-                'title': title,
-                'text': content,
-                'image_url': image_url,
-                'local_image_path': local_image_path,
-                'success': True if content else False
+                'html': response.content,
+                'success': True
             }
         except Exception as e:
+            return self._error_result(url, e)
+
+    def build_article(self, url, extracted):
+        # Final stage: image download and the article dict expected by NewsScraper/Storage
+        try:
+            local_image_path = None
+            if self.download_images and extracted['image_url']:
+                local_image_path = self._download_image(extracted['image_url'])
+                
             return {
                 'url': url,
-                'title': "Error",
-                'text': None,
-                'success': False,
-                'error': str(e)
+                **extracted,
+                'local_image_path': local_image_path,
+                'success': True if extracted['text'] else False
             }
+        except Exception as e:
+            return self._error_result(url, e)
 
-    def _extract_title(self, html):
-        soup = BeautifulSoup(html, 'lxml')
-        og_title = soup.find('meta', property='og:title')
-        if og_title and og_title.get('content'):
-            return og_title.get('content')
+    def _error_result(self, url, error):
+        return {
+            'url': url,
+            'title': "Error",
+            'text': None,
+            'success': False,
+            'error': str(error)
+        }
+
+    def extract_article(self, html, url):
+        # The document is parsed once and the same lxml tree is shared by every extractor
+        tree = load_html(html)
+        if tree is None:
+            raise ValueError("Empty or invalid HTML document")
+
+        # 1. Title Extraction
+        title = self._extract_title(tree)
+        
+        # 2. Main Content Extraction (trafilatura works on its own copy of the tree)
+        content = trafilatura.extract(tree, include_images=True)
+        if not content:
+            content = self._fallback_content_extraction(tree)
             
-        tw_title = soup.find('meta', name='twitter:title')
-        if tw_title and tw_title.get('content'):
-            return tw_title.get('content')
+        # 3. Main Image Extraction
+        image_url = self._extract_main_image(tree, url)
+
+        # 4. Metadata Extraction
+        metadata = self._extract_metadata(tree)
+
+        return {
+            'title': title,
+            'text': content,
+            'image_url': image_url,
+            **metadata
+        }
+
+    def _meta_content(self, tree, *attributes):
+        # Returns the first non-empty <meta content> matching any (attribute, value) pair
+        for attribute, value in attributes:
+            for content in tree.xpath(f'//meta[@{attribute}=$value]/@content', value=value):
+                if content.strip():
+                    return content.strip()
+        return None
+
+    def _text_content(self, element):
+        return '\n'.join(element.itertext()).strip()
+
+    def _extract_title(self, tree):
+        title = self._meta_content(tree, ('property', 'og:title'), ('name', 'twitter:title'))
+        if title:
+            return title
             
-        h1 = soup.find('h1')
-        if h1:
-            return h1.get_text().strip()
+        h1 = tree.find('.//h1')
+        if h1 is not None:
+            return h1.text_content().strip()
             
-        title_tag = soup.find('title')
-        if title_tag:
-            return title_tag.get_text().strip()
+        title_tag = tree.find('.//title')
+        if title_tag is not None:
+            return title_tag.text_content().strip()
             
         return "No Title Found"
 
-    def _fallback_content_extraction(self, html):
-        soup = BeautifulSoup(html, 'lxml')
-        for selector in ['article', '.article-body', '.entry-content', '.post-content', 'main']:
-            element = soup.select_one(selector)
-            if element:
-                return element.get_text(separator='\n').strip()
+    def _fallback_content_extraction(self, tree):
+        for xpath in [
+            '//article',
+            _class_xpath('article-body'), _class_xpath('entry-content'),
+            _class_xpath('post-content'), '//main'
+        ]:
+            elements = tree.xpath(xpath)
+            if elements:
+                return self._text_content(elements[0])
         
-        content_div = soup.find('div', class_=lambda x: x and ('article' in x or 'content' in x or 'body' in x))
-        if content_div:
-            return content_div.get_text(separator='\n').strip()
+        content_divs = tree.xpath(
+            '//div[contains(@class, "article") or contains(@class, "content") or contains(@class, "body")]'
+        )
+        if content_divs:
+            return self._text_content(content_divs[0])
             
         return None
 
-    def _extract_main_image(self, html, base_url):
-        soup = BeautifulSoup(html, 'lxml')
-        
+    def _extract_main_image(self, tree, base_url):
         # 1. Open Graph Image (Most reliable for social sharing/preview)
-        og_image = soup.find('meta', property='og:image') or soup.find('meta', attrs={"name": "og:image"})
-        if og_image and og_image.get('content'):
-            return urljoin(base_url, og_image.get('content'))
-            
         # 2. Twitter Card Image
-        tw_image = soup.find('meta', name='twitter:image') or soup.find('meta', property='twitter:image')
-        if tw_image and tw_image.get('content'):
-            return urljoin(base_url, tw_image.get('content'))
-            
         # 3. Schema.org Image
-        schema_image = soup.find('meta', itemprop='image')
-        if schema_image and schema_image.get('content'):
-            return urljoin(base_url, schema_image.get('content'))
+        image = self._meta_content(
+            tree,
+            ('property', 'og:image'), ('name', 'og:image'),
+            ('name', 'twitter:image'), ('property', 'twitter:image'),
+            ('itemprop', 'image')
+        )
+        if image:
+            return urljoin(base_url, image)
 
         # 4. Article specific image (e.g., featured image)
         # Common selectors for featured images in various CMS
-        featured_selectors = [
-            'img.featured-image', 'img.attachment-post-thumbnail', 
-            '.post-thumbnail img', '.article-header img',
-            '.entry-content img', 'article img'
+        featured_xpaths = [
+            _class_xpath('featured-image', tag='img'), _class_xpath('attachment-post-thumbnail', tag='img'),
+            _class_xpath('post-thumbnail') + '//img', _class_xpath('article-header') + '//img',
+            _class_xpath('entry-content') + '//img', '//article//img'
         ]
-        for selector in featured_selectors:
-            img = soup.select_one(selector)
-            if img and img.get('src'):
-                # Basic check to avoid small icons (optional)
-                return urljoin(base_url, img.get('src'))
+        for xpath in featured_xpaths:
+            for src in tree.xpath(xpath + '/@src'):
+                if src:
+                    return urljoin(base_url, src)
                 
         return None
 
+    def _extract_metadata(self, tree):
+        # Only the fields found in the page are returned, so they never blank out feed values
+        metadata = {}
+        author = self._meta_content(tree, ('name', 'author'), ('property', 'article:author'))
+        if author:
+            metadata['author'] = author
+        published = self._meta_content(
+            tree, ('property', 'article:published_time'), ('itemprop', 'datePublished')
+        )
+        if published:
+            metadata['published_date'] = published
+        return metadata
+
     def _download_image(self, url):
         try:
             # Use path relative to the script's directory
             images_dir = os.path.join(self.base_dir, 'output', 'images')
             os.makedirs(images_dir, exist_ok=True)
             
-            response = requests.get(url, headers=self.headers, timeout=self.timeout, stream=True)
-            response.raise_for_status()
-            
-            url_hash = hashlib.md5(url.encode()).hexdigest()
-            parsed_url = urlparse(url)
-            ext = os.path.splitext(parsed_url.path)[1]
-            if not ext or len(ext) > 5:
-                ext = '.jpg'
+            # The context manager hands the connection back to the pool once streamed
+            with self.http_client.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
                 
-            filename = f"{url_hash}{ext}"
-            filepath = os.path.join(images_dir, filename)
-            
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+                url_hash = hashlib.md5(url.encode()).hexdigest()
+                parsed_url = urlparse(url)
+                ext = os.path.splitext(parsed_url.path)[1]
+                if not ext or len(ext) > 5:
+                    ext = '.jpg'
+                    
+                filename = f"{url_hash}{ext}"
+                filepath = os.path.join(images_dir, filename)
+                
+                with open(filepath, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
             return filepath
         except Exception:
             return None
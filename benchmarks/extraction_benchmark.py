@@ -0,0 +1,151 @@
+"""Micro-benchmark: legacy multi-parse extraction vs. the single-parse ArticleScraper engine.
+
+Usage:
+    python benchmarks/extraction_benchmark.py [corpus_dir] [--iterations N]
+
+The corpus is a directory of saved article pages (*.html). Each path runs in its own
+process so that CPU time and peak RSS are measured independently.
+"""
+import argparse
+import glob
+import os
+import resource
+import sys
+import time
+from multiprocessing import get_context
+from urllib.parse import urljoin
+
+import trafilatura
+from bs4 import BeautifulSoup
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from article_scraper import ArticleScraper
+
+# Legacy path: the extraction code as it was before the single-parse engine,
+# where the HTML is parsed once by trafilatura and three more times by BeautifulSoup
+
+def _legacy_title(html):
+    soup = BeautifulSoup(html, 'lxml')
+    og_title = soup.find('meta', property='og:title')
+    if og_title and og_title.get('content'):
+        return og_title.get('content')
+    tw_title = soup.find('meta', attrs={'name': 'twitter:title'})
+    if tw_title and tw_title.get('content'):
+        return tw_title.get('content')
+    h1 = soup.find('h1')
+    if h1:
+        return h1.get_text().strip()
+    title_tag = soup.find('title')
+    if title_tag:
+        return title_tag.get_text().strip()
+    return "No Title Found"
+
+def _legacy_fallback_content(html):
+    soup = BeautifulSoup(html, 'lxml')
+    for selector in ['article', '.article-body', '.entry-content', '.post-content', 'main']:
+        element = soup.select_one(selector)
+        if element:
+            return element.get_text(separator='\n').strip()
+    content_div = soup.find('div', class_=lambda x: x and ('article' in x or 'content' in x or 'body' in x))
+    if content_div:
+        return content_div.get_text(separator='\n').strip()
+    return None
+
+def _legacy_main_image(html, base_url):
+    soup = BeautifulSoup(html, 'lxml')
+    og_image = soup.find('meta', property='og:image') or soup.find('meta', attrs={"name": "og:image"})
+    if og_image and og_image.get('content'):
+        return urljoin(base_url, og_image.get('content'))
+    tw_image = soup.find('meta', attrs={'name': 'twitter:image'}) or soup.find('meta', property='twitter:image')
+    if tw_image and tw_image.get('content'):
+        return urljoin(base_url, tw_image.get('content'))
+    schema_image = soup.find('meta', itemprop='image')
+    if schema_image and schema_image.get('content'):
+        return urljoin(base_url, schema_image.get('content'))
+    for selector in ['img.featured-image', 'img.attachment-post-thumbnail', '.post-thumbnail img',
+                     '.article-header img', '.entry-content img', 'article img']:
+        img = soup.select_one(selector)
+        if img and img.get('src'):
+            return urljoin(base_url, img.get('src'))
+    return None
+
+def legacy_extract(html, url):
+    title = _legacy_title(html)
+    content = trafilatura.extract(html, include_images=True)
+    if not content:
+        content = _legacy_fallback_content(html)
+    image_url = _legacy_main_image(html, url)
+    return {'title': title, 'text': content, 'image_url': image_url}
+
+_scraper = ArticleScraper(download_images=False)
+
+def single_parse_extract(html, url):
+    return _scraper.extract_article(html, url)
+
+PATHS = {
+    'legacy': legacy_extract,
+    'single-parse': single_parse_extract,
+}
+
+def _run_path(path_name, documents, iterations):
+    extract = PATHS[path_name]
+    # Warm-up outside the measurement (imports, trafilatura caches)
+    for url, html in documents:
+        extract(html, url)
+
+    start_cpu = time.process_time()
+    start_wall = time.perf_counter()
+    for _ in range(iterations):
+        for url, html in documents:
+            extract(html, url)
+    cpu = time.process_time() - start_cpu
+    wall = time.perf_counter() - start_wall
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'cpu': cpu, 'wall': wall, 'peak_rss_kb': peak_rss_kb}
+
+def load_corpus(corpus_dir):
+    documents = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '*.html'))):
+        with open(path, 'rb') as f:
+            documents.append((f'https://example.com/{os.path.basename(path)}', f.read()))
+    return documents
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('corpus_dir', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus'))
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus_dir)
+    if not documents:
+        print(f"No *.html files found in {args.corpus_dir}")
+        return 1
+
+    total_docs = len(documents) * args.iterations
+    print(f"Corpus: {len(documents)} documents x {args.iterations} iterations")
+
+    results = {}
+    ctx = get_context('spawn')
+    for path_name in PATHS:
+        # The legacy path received response.text, the new one response.content
+        path_documents = documents if path_name != 'legacy' else [
+            (url, html.decode('utf-8', errors='replace')) for url, html in documents
+        ]
+        with ctx.Pool(1) as pool:
+            results[path_name] = pool.apply(_run_path, (path_name, path_documents, args.iterations))
+
+    for path_name, result in results.items():
+        print(
+            f"{path_name:>13}: {result['cpu'] * 1000 / total_docs:8.2f} ms CPU/article, "
+            f"{total_docs / result['wall']:8.1f} articles/s, peak RSS {result['peak_rss_kb'] / 1024:.1f} MiB"
+        )
+
+    legacy, new = results['legacy'], results['single-parse']
+    print(f"CPU speed-up: {legacy['cpu'] / new['cpu']:.2f}x, "
+          f"peak RSS ratio: {legacy['peak_rss_kb'] / new['peak_rss_kb']:.2f}x")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,49 @@
 import feedparser
+import hashlib
 from datetime import datetime
 from dateutil import parser as date_parser
+from http_client import HttpClient
 
 class FeedReader:
-    def __init__(self, user_agent=None):
+    def __init__(self, user_agent=None, timeout=10, http_client=None):
         self.user_agent = user_agent or 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        self.timeout = timeout
+        self.http_client = http_client or HttpClient(user_agent=self.user_agent, timeout=timeout)
 
     def parse_feed(self, url):
         # Use feedparser to read the feed
         feed = feedparser.parse(url, agent=self.user_agent)
+        return self._normalize_entries(feed)
+
+    def poll_feed(self, url, feed_state=None):
+        # Conditional GET: send the validators stored from the previous poll so that
+        # the server can answer 304, and compare the body hash for servers that don't
+        feed_state = feed_state or {}
+        headers = {}
+        if feed_state.get('etag'):
+            headers['If-None-Match'] = feed_state['etag']
+        if feed_state.get('last_modified'):
+            headers['If-Modified-Since'] = feed_state['last_modified']
+
+        response = self.http_client.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return {**feed_state, 'url': url, 'not_modified': True, 'entries': []}
+        response.raise_for_status()
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        result = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': content_hash,
+            'not_modified': content_hash == feed_state.get('content_hash'),
+            'entries': []
+        }
+        if not result['not_modified']:
+            result['entries'] = self._normalize_entries(feedparser.parse(response.content))
+        return result
+
+    def _normalize_entries(self, feed):
         entries = []
         
         for entry in feed.get('entries', []):
@@ -0,0 +1,102 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Transient errors worth retrying; 4xx other than 429 are never retried
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+class _CountingRetry(Retry):
+    # Retry that reports every retry it schedules to the owning HttpClient
+    on_retry = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.on_retry = self.on_retry
+        return retry
+
+    def increment(self, *args, **kwargs):
+        # super() raises MaxRetryError when retries are exhausted, so only real retries are counted
+        retry = super().increment(*args, **kwargs)
+        if self.on_retry:
+            self.on_retry()
+        return retry
+
+def _counting_pool(pool_class, on_request, on_new_connection):
+    class CountingConnectionPool(pool_class):
+        def urlopen(self, *args, **kwargs):
+            on_request()
+            return super().urlopen(*args, **kwargs)
+
+        def _new_conn(self):
+            on_new_connection()
+            return super()._new_conn()
+
+    return CountingConnectionPool
+
+class HttpClient:
+    def __init__(self, user_agent=None, timeout=10, retries=3, backoff_factor=0.5,
+                 backoff_jitter=0.5, max_connections_per_host=4, max_hosts=50):
+        self.timeout = timeout
+        self._stats = {
+            'http_requests': 0,
+            'http_connections_new': 0,
+            'http_retries': 0
+        }
+        self._stats_lock = threading.Lock()
+
+        retry = _CountingRetry(
+            total=retries,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            # Hand the last response back to the caller instead of raising, so that
+            # raise_for_status() reports the real status code
+            raise_on_status=False
+        )
+        retry.on_retry = lambda: self._count('http_retries')
+
+        # Keep-alive pool per host; pool_block caps concurrent connections to one host
+        adapter = HTTPAdapter(
+            pool_connections=max_hosts,
+            pool_maxsize=max_connections_per_host,
+            pool_block=True,
+            max_retries=retry
+        )
+        on_request = lambda: self._count('http_requests')
+        on_new_connection = lambda: self._count('http_connections_new')
+        adapter.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, on_request, on_new_connection),
+            'https': _counting_pool(HTTPSConnectionPool, on_request, on_new_connection)
+        }
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent or DEFAULT_USER_AGENT,
+            # Includes "br" when the brotli package is installed
+            'Accept-Encoding': DEFAULT_ACCEPT_ENCODING
+        })
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['http_connections_reused'] = max(0, stats['http_requests'] - stats['http_connections_new'])
+        return stats
+
+    def close(self):
+        self.session.close()
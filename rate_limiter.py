@@ -0,0 +1,23 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+class DomainRateLimiter:
+    def __init__(self, delay=1):
+        # Minimum number of seconds between two requests to the same domain
+        self.delay = delay
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        # Reserve the next free slot for the URL's domain and sleep until it arrives.
+        # Different domains never wait on each other.
+        domain = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(domain, now))
+            self._next_slot[domain] = slot + self.delay
+
+        remaining = slot - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
@@ -0,0 +1,35 @@
+import fcntl
+import os
+
+class RunLock:
+    # Inter-process lock on a file (flock), shared by the API and cron-launched runs.
+    # The kernel releases it when the holding process dies, so a crash never leaves it stuck.
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def acquire(self):
+        # Non-blocking: returns False when another process (or thread) holds the lock
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    def is_locked(self):
+        if self._fd is not None:
+            return True
+        if not self.acquire():
+            return True
+        self.release()
+        return False
@@ -1,10 +1,62 @@
 import json
+import multiprocessing
 import os
+import queue
+import threading
 import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 from datetime import datetime
+from urllib.parse import urlparse
 from feed_reader import FeedReader
-from article_scraper import ArticleScraper
+from article_scraper import ArticleScraper, extract_article_html
 from storage import Storage
+from rate_limiter import DomainRateLimiter
+from http_client import HttpClient
+from url_utils import canonicalize_url
+from run_lock import RunLock
+
+# Extraction workers are started from a clean server process rather than forked from
+# the caller, which may be the multi-threaded API process
+EXTRACTION_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+class ScrapeAlreadyRunning(Exception):
+    pass
+
+def get_run_lock(storage):
+    # The lock file lives next to the database, so every process using it shares the lock
+    return RunLock(os.path.join(os.path.dirname(storage.db_path), 'scrape.lock'))
+
+class JobProgress:
+    # Progress of a run, persisted in scrape_jobs for /scrape-jobs/{id}.
+    # Counter updates are written at most once per min_interval seconds.
+    def __init__(self, storage, job_id, min_interval=1.0):
+        self.storage = storage
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self._fields = {}
+        self._counters = {}
+        self._last_write = 0
+        self._lock = threading.Lock()
+
+    def increment(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+        self.update()
+
+    def update(self, force=False, **fields):
+        with self._lock:
+            self._fields.update(fields)
+            now = time.monotonic()
+            if not force and now - self._last_write < self.min_interval:
+                return
+            self._last_write = now
+            pending = {**self._fields, **self._counters}
+            self._fields = {}
+        if pending:
+            self.storage.update_scrape_job(self.job_id, **pending)
 
 class NewsScraper:
     def __init__(self, config_path=None):
@@ -22,16 +74,38 @@ class NewsScraper:
             
         self.config = self._load_config()
         self.storage = Storage()
+        self.run_lock = get_run_lock(self.storage)
         
         settings = self.config.get('settings', {})
-        self.feed_reader = FeedReader(user_agent=settings.get('user_agent'))
+        if settings.get('seen_url_index', True):
+            self.storage.enable_seen_index()
+        # One pooled HTTP client shared by feeds and articles so connections are reused
+        self.http_client = HttpClient(
+            user_agent=settings.get('user_agent'),
+            timeout=settings.get('request_timeout_seconds', 10),
+            retries=settings.get('http_retries', 3),
+            backoff_factor=settings.get('http_backoff_factor', 0.5),
+            backoff_jitter=settings.get('http_backoff_jitter', 0.5),
+            max_connections_per_host=settings.get('max_connections_per_host', 4)
+        )
+        self.feed_reader = FeedReader(
+            user_agent=settings.get('user_agent'),
+            timeout=settings.get('request_timeout_seconds', 10),
+            http_client=self.http_client
+        )
         self.article_scraper = ArticleScraper(
             user_agent=settings.get('user_agent'),
             timeout=settings.get('request_timeout_seconds', 10),
-            download_images=settings.get('download_images', True)
+            download_images=settings.get('download_images', True),
+            http_client=self.http_client
         )
         self.delay = settings.get('request_delay_seconds', 1)
         self.max_articles = settings.get('max_articles_per_feed', 10)
+        # Articles committed per transaction; defaults to one feed's worth
+        self.write_batch_size = max(1, settings.get('write_batch_size') or self.max_articles)
+        self.max_concurrent_requests = max(1, settings.get('max_concurrent_requests', 8))
+        self.extraction_workers = max(1, settings.get('extraction_workers') or os.cpu_count() or 1)
+        self.rate_limiter = DomainRateLimiter(delay=self.delay)
 
     def _load_config(self):
         if not os.path.exists(self.config_path):
@@ -40,8 +114,36 @@ class NewsScraper:
         with open(self.config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
-    def run(self):
+    def run(self, job_id=None):
+        # Only one run at a time across the API and cron: the lock is held for the whole run
+        job_id = job_id or uuid.uuid4().hex
+        if not self.run_lock.acquire():
+            raise ScrapeAlreadyRunning("Another scrape run is already in progress")
+
+        progress = JobProgress(self.storage, job_id)
+        try:
+            if not self.storage.get_scrape_job(job_id):
+                self.storage.create_scrape_job(job_id, status='running')
+            self.storage.fail_stale_scrape_jobs(job_id)
+            progress.update(force=True, status='running', stage='starting', started_at=datetime.now().isoformat())
+
+            stats = self._run(progress)
+            stats['job_id'] = job_id
+
+            progress.update(
+                force=True, status='completed', stage='done',
+                finished_at=stats['end_time'], result=stats
+            )
+            return stats
+        except Exception as e:
+            progress.update(force=True, status='failed', finished_at=datetime.now().isoformat(), error=str(e))
+            raise
+        finally:
+            self.run_lock.release()
+
+    def _run(self, progress):
         start_time = datetime.now().isoformat()
+        http_stats_start = self.http_client.get_stats()
         feeds = [f for f in self.config.get('feeds', []) if f.get('enabled', True)]
         
         stats = {
@@ -49,28 +151,51 @@ class NewsScraper:
             'articles_found': 0,
             'articles_new': 0,
             'articles_skipped_duplicate': 0,
-            'articles_skipped_domain': 0
+            'articles_skipped_domain': 0,
+            'feeds_not_modified': 0,
+            'articles_failed': 0
         }
         
         all_new_articles = []
-        
-        for feed_config in feeds:
+        pending_entries = []
+        seen_urls = set()
+        feed_states = self.storage.get_feed_states()
+        progress.update(force=True, stage='polling_feeds', feeds_total=len(feeds))
+
+        def poll(feed_config):
             print(f"Processing feed: {feed_config['name']})")
             try:
-                entries = self.feed_reader.parse_feed(feed_config['url'])
+                return self.feed_reader.poll_feed(feed_config['url'], feed_states.get(feed_config['url']))
             except Exception as e:
                 print(f"Error parsing feed {feed_config['name']}: {e}")
+                return None
+            finally:
+                progress.increment('feeds_done')
+
+        # All enabled feeds are polled concurrently; results are consumed in config order
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as executor:
+            poll_results = list(executor.map(poll, feeds))
+
+        polled_feeds = []
+        for feed_config, result in zip(feeds, poll_results):
+            if result is None:
+                continue
+            polled_feeds.append(result)
+            if result['not_modified']:
+                print(f"Feed not modified since last run: {feed_config['name']}")
+                stats['feeds_not_modified'] += 1
                 continue
 
-            entries_to_process = entries[:self.max_articles]
+            entries_to_process = [entry for entry in result['entries'][:self.max_articles] if entry.get('link')]
             stats['articles_found'] += len(entries_to_process)
+
+            # One batched lookup per feed instead of one query per entry
+            unseen_urls = set(self.storage.filter_unseen([entry['link'] for entry in entries_to_process]))
             
             for entry in entries_to_process:
-                url = entry.get('link')
-                if not url:
-                    continue
-
-                if self.storage.url_exists(url):
+                url = entry['link']
+                canonical_url = canonicalize_url(url)
+                if url not in unseen_urls or canonical_url in seen_urls:
                     stats['articles_skipped_duplicate'] += 1
                     continue
                 
@@ -80,38 +205,157 @@ class NewsScraper:
                 #     stats['articles_skipped_domain'] += 1
                 #     continue
                 
-                print(f"Scraping article: {url}")
-                article_data = self.article_scraper.scrape_article(url)
-                
-                if not article_data.get('success'):
-                    print(f"Failed to scrape article: {url}")
-                    continue
-
-                full_article_data = {
-                    **entry, 
-                    **article_data
-                }
+                seen_urls.add(canonical_url)
+                pending_entries.append(entry)
 
-                if not full_article_data.get('image_url') and entry.get('image_from_feed'):
-                    full_article_data['image_url'] = entry['image_from_feed']
-                
-                article_id = self.storage.add_article(full_article_data)
-                if article_id:
-                    all_new_articles.append(full_article_data)
-                    stats['articles_new'] += 1
-                
-                time.sleep(self.delay)
+        progress.update(force=True, stage='scraping_articles')
+        for article_data in self._scrape_entries(self._interleave_by_domain(pending_entries), stats, progress):
+            all_new_articles.append(article_data)
+            stats['articles_new'] += 1
                 
+        # Validators are only stored once the feed's articles have been processed,
+        # so an interrupted run polls the same feeds in full again
+        for feed_state in polled_feeds:
+            self.storage.save_feed_state(feed_state)
+
+        # HttpClient counters are cumulative, report only this run's share
+        http_stats = self.http_client.get_stats()
+        stats.update({key: value - http_stats_start[key] for key, value in http_stats.items()})
         stats['end_time'] = datetime.now().isoformat()
         self.storage.log_scrape_run(stats)
         
+        progress.update(force=True, stage='exporting')
         if all_new_articles:
             date_str = datetime.now().strftime('%Y-%m-%d')
             self.storage.export_to_json(all_new_articles, date_str)
             
         return stats
 
+    def _scrape_entries(self, entries, stats, progress):
+        # Three stages connected by a bounded queue:
+        #   fetch   - thread pool, articles from different newspapers in parallel while the
+        #             rate limiter keeps requests to one domain spaced by request_delay_seconds
+        #   extract - process pool sized to the available cores (CPU-bound trafilatura/lxml)
+        #   store   - thread pool for image download; articles are written in batches,
+        #             each batch in a single transaction
+        # A full queue makes the fetchers wait for the parser, and the parser never
+        # sits idle while there is fetched HTML waiting.
+        max_in_flight = self.extraction_workers * 2
+        extract_queue = queue.Queue(maxsize=max_in_flight)
+        in_flight = threading.BoundedSemaphore(max_in_flight)
+        new_articles = []
+        write_batch = []
+        results_lock = threading.Lock()
+
+        def write(batch):
+            article_ids = self.storage.add_articles_many(batch)
+            with results_lock:
+                new_articles.extend(
+                    article_data for article_data, article_id in zip(batch, article_ids) if article_id
+                )
+            progress.increment('articles_new', sum(1 for article_id in article_ids if article_id))
+
+        def fail(url):
+            print(f"Failed to scrape article: {url}")
+            with results_lock:
+                stats['articles_failed'] += 1
+            progress.increment('articles_failed')
+
+        def fetch(entry):
+            url = entry['link']
+            self.rate_limiter.wait(url)
+            print(f"Scraping article: {url}")
+            fetched = self.article_scraper.fetch_article(url)
+            if not fetched['success']:
+                fail(url)
+                return
+            extract_queue.put((entry, fetched['html']))
+
+        def close_queue(fetch_futures):
+            wait(fetch_futures)
+            extract_queue.put(None)
+
+        def store(entry, future):
+            url = entry['link']
+            try:
+                article_data = self.article_scraper.build_article(url, future.result())
+            except Exception as e:
+                article_data = {'url': url, 'success': False, 'error': str(e)}
+            full_article_data = self._prepare_entry(entry, article_data)
+            if not full_article_data:
+                fail(url)
+                return
+            with results_lock:
+                write_batch.append(full_article_data)
+                if len(write_batch) < self.write_batch_size:
+                    return
+                batch = write_batch[:]
+                write_batch.clear()
+            write(batch)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as fetch_pool, \
+                ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as store_pool, \
+                ProcessPoolExecutor(max_workers=self.extraction_workers, mp_context=EXTRACTION_MP_CONTEXT) as extract_pool:
+            fetch_futures = [fetch_pool.submit(fetch, entry) for entry in entries]
+            threading.Thread(target=close_queue, args=(fetch_futures,), daemon=True).start()
+
+            def on_extracted(future, entry):
+                in_flight.release()
+                store_pool.submit(store, entry, future)
+
+            while True:
+                item = extract_queue.get()
+                if item is None:
+                    break
+                entry, html = item
+                in_flight.acquire()
+                future = extract_pool.submit(extract_article_html, html, entry['link'])
+                future.add_done_callback(lambda f, entry=entry: on_extracted(f, entry))
+
+        if write_batch:
+            write(write_batch)
+        return new_articles
+
+    def _prepare_entry(self, entry, article_data):
+        if not article_data.get('success'):
+            return None
+
+        full_article_data = {
+            **entry, 
+            **article_data
+        }
+
+        # Feed metadata takes precedence; values read from the page only fill the gaps
+        for key in ('author', 'published_date'):
+            if entry.get(key):
+                full_article_data[key] = entry[key]
+
+        if not full_article_data.get('image_url') and entry.get('image_from_feed'):
+            full_article_data['image_url'] = entry['image_from_feed']
+        
+        return full_article_data
+
+    def _interleave_by_domain(self, entries):
+        # Round-robin across domains so that workers are spread over different
+        # hosts instead of queueing up behind the same newspaper's rate limit
+        by_domain = {}
+        for entry in entries:
+            by_domain.setdefault(urlparse(entry['link']).netloc, []).append(entry)
+
+        queues = list(by_domain.values())
+        interleaved = []
+        while queues:
+            for queue in queues:
+                interleaved.append(queue.pop(0))
+            queues = [queue for queue in queues if queue]
+        return interleaved
+
 if __name__ == "__main__":
     scraper = NewsScraper()
-    result = scraper.run()
-    print(f"Scraping completed. Results: {json.dumps(result, indent=2)}")
+    try:
+        result = scraper.run()
+    except ScrapeAlreadyRunning as e:
+        # e.g. the cron tick fires while an API-triggered run is still going
+        print(f"Skipping run: {e}")
+    else:
+        print(f"Scraping completed. Results: {json.dumps(result, indent=2)}")
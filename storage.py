@@ -1,9 +1,72 @@
 import sqlite3
+import base64
 import json
 import os
+import threading
 import hashlib
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from dateutil import parser as date_parser
 from urllib.parse import urlparse
+from url_utils import canonicalize_url
+
+# Stay well below SQLite's host parameter limit in IN (...) queries
+MAX_QUERY_PARAMS = 500
+
+def normalize_published_date(published_date):
+    # Parses the free-form ISO date stored in published_date into a UTC epoch
+    # timestamp and UTC calendar day. Naive dates are taken as local time, which is
+    # what FeedReader falls back to. Returns (None, None) when it can't be parsed.
+    if not published_date:
+        return None, None
+    try:
+        dt = date_parser.parse(published_date).astimezone(timezone.utc)
+    except (ValueError, OverflowError, TypeError):
+        return None, None
+    return int(dt.timestamp()), dt.strftime('%Y-%m-%d')
+
+def _validate_day(day):
+    try:
+        return datetime.strptime(day, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"Invalid date '{day}', expected YYYY-MM-DD")
+
+def encode_cursor(item):
+    # Opaque keyset pagination cursor pointing just after the given news list item
+    return base64.urlsafe_b64encode(f"{item['published_ts']}:{item['id']}".encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        published_ts, article_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return int(published_ts), int(article_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def encode_search_cursor(item):
+    # Search results are ordered by (score, id); repr() round-trips the float exactly
+    return base64.urlsafe_b64encode(f"{item['score']!r}:{item['id']}".encode()).decode()
+
+def decode_search_cursor(cursor):
+    try:
+        score, article_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return float(score), int(article_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def build_match_query(query):
+    # Turns free text into a safe FTS5 query: every word is quoted (so user input
+    # can't inject FTS syntax) and all words must match
+    terms = [term.replace('"', '""') for term in query.split()]
+    terms = [f'"{term}"' for term in terms if any(char.isalnum() for char in term)]
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return ' '.join(terms)
+
+# BM25 column weights for title, summary, text, tags
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0, 3.0)
+
+SQLITE_BUSY_TIMEOUT_SECONDS = 30
+SQLITE_CACHE_SIZE_KB = 20000
+SQLITE_MMAP_SIZE_BYTES = 256 * 1024 * 1024
 
 class Storage:
     def __init__(self, db_path=None):
@@ -20,14 +83,39 @@ class Storage:
         else:
             self.db_path = db_path
             
+        # Optional in-process index of canonical URLs already processed (see enable_seen_index)
+        self._seen_index = None
+        self._local = threading.local()
         self._init_db()
 
     def _get_connection(self):
-        return sqlite3.connect(self.db_path)
+        # One long-lived connection per thread instead of a new one per call.
+        # Use it as a context manager ("with self._get_connection() as conn") to get
+        # a transaction that is committed on success and rolled back on error.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS)
+            conn.row_factory = sqlite3.Row
+            # WAL lets API readers run while the scraper writes; NORMAL is durable in WAL mode
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute(f'PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}')
+            conn.execute('PRAGMA temp_store = MEMORY')
+            conn.execute(f'PRAGMA mmap_size = {SQLITE_MMAP_SIZE_BYTES}')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        # Closes the calling thread's connection; other threads keep theirs
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
     def _init_db(self):
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         with self._get_connection() as conn:
+            # journal_mode is persistent, so it only needs to be set once per database file
+            conn.execute('PRAGMA journal_mode = WAL')
             cursor = conn.cursor()
             # Table for articles
             cursor.execute('''
@@ -67,13 +155,139 @@ class Storage:
                     articles_skipped_domain INTEGER
                 )
             ''')
+            # Table for feed HTTP validators (conditional GET)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS feed_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            # Table for scrape jobs (progress of API- and cron-triggered runs)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS scrape_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT,
+                    stage TEXT,
+                    feeds_total INTEGER DEFAULT 0,
+                    feeds_done INTEGER DEFAULT 0,
+                    articles_new INTEGER DEFAULT 0,
+                    articles_failed INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP,
+                    result TEXT,
+                    error TEXT
+                )
+            ''')
+            self._migrate(cursor)
             conn.commit()
 
+    def _migrate(self, cursor):
+        # Schema migrations for databases created by older versions, tracked with
+        # PRAGMA user_version. Each step runs once, in order.
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+        migrations = [
+            self._migrate_published_columns,
+            self._migrate_full_text_search,
+        ]
+        for target_version, migration in enumerate(migrations, start=1):
+            if version < target_version:
+                migration(cursor)
+                cursor.execute(f'PRAGMA user_version = {target_version}')
+
+    def _migrate_published_columns(self, cursor):
+        # v1: normalized UTC publish timestamp/day, indexed for get_news_list
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(articles)')}
+        if 'published_ts' not in columns:
+            cursor.execute('ALTER TABLE articles ADD COLUMN published_ts INTEGER')
+        if 'published_day' not in columns:
+            cursor.execute('ALTER TABLE articles ADD COLUMN published_day TEXT')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_articles_used_day_ts
+            ON articles (used, published_day, published_ts)
+        ''')
+
+        rows = cursor.execute('SELECT id, published_date FROM articles WHERE published_ts IS NULL').fetchall()
+        cursor.executemany(
+            'UPDATE articles SET published_ts = ?, published_day = ? WHERE id = ?',
+            [(*normalize_published_date(row[1]), row[0]) for row in rows]
+        )
+
+    def _migrate_full_text_search(self, cursor):
+        # v2: FTS5 index over title/summary/text/tags, kept in sync with articles by
+        # triggers (so add_article, deletes and edits are covered) and backfilled with
+        # 'rebuild'. remove_diacritics makes "politica" match "política".
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, summary, text, tags,
+                content='articles', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, summary, text, tags)
+                VALUES (new.id, new.title, new.summary, new.text, new.tags);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, text, tags)
+                VALUES ('delete', old.id, old.title, old.summary, old.text, old.tags);
+            END
+        ''')
+        # Only content columns: marking an article as used must not touch the index
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary, text, tags ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, text, tags)
+                VALUES ('delete', old.id, old.title, old.summary, old.text, old.tags);
+                INSERT INTO articles_fts (rowid, title, summary, text, tags)
+                VALUES (new.id, new.title, new.summary, new.text, new.tags);
+            END
+        ''')
+        cursor.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+
     def url_exists(self, url):
+        return not self.filter_unseen([url])
+
+    def enable_seen_index(self):
+        # Warm an in-memory set with every processed URL so that the common
+        # "already seen" case never touches the database
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT 1 FROM processed_urls WHERE url = ?', (url,))
-            return cursor.fetchone() is not None
+            cursor.execute('SELECT url FROM processed_urls')
+            self._seen_index = {canonicalize_url(row[0]) for row in cursor}
+
+    def filter_unseen(self, urls):
+        # Returns the URLs (in their original form and order) that have not been processed yet.
+        # The whole batch is resolved with one connection; rows written before URLs
+        # were canonicalized are matched by their raw form as well.
+        candidates = {}
+        for url in urls:
+            canonical = canonicalize_url(url)
+            if self._seen_index is not None and canonical in self._seen_index:
+                continue
+            candidates[url] = canonical
+        if not candidates:
+            return []
+
+        keys = list(set(candidates) | set(candidates.values()))
+        seen = set()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(keys), MAX_QUERY_PARAMS):
+                chunk = keys[i:i + MAX_QUERY_PARAMS]
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(f'SELECT url FROM processed_urls WHERE url IN ({placeholders})', chunk)
+                seen.update(row[0] for row in cursor.fetchall())
+
+        return [
+            url for url, canonical in candidates.items()
+            if url not in seen and canonical not in seen
+        ]
 
     def domain_exists(self, url):
         domain = urlparse(url).netloc
@@ -83,30 +297,50 @@ class Storage:
             return cursor.fetchone() is not None
 
     def add_article(self, article_data):
-        domain = urlparse(article_data['url']).netloc
+        return self.add_articles_many([article_data])[0]
+
+    def add_articles_many(self, articles):
+        # Inserts a batch of articles and their processed URLs in a single transaction.
+        # Returns the new ids in input order, None for URLs that were already stored.
+        article_ids = []
+        canonical_urls = []
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            try:
-                # Handle tags which might be a list
-                tags_json = json.dumps(article_data.get('tags', [])) if isinstance(article_data.get('tags'), list) else article_data.get('tags', '[]')
-                
-                cursor.execute('''
-                    INSERT INTO articles (
-                        url, domain, title, text, summary, image_url, 
-                        local_image_path, author, published_date, tags, success
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    article_data['url'], domain, article_data['title'], 
-                    article_data.get('text'), article_data.get('summary'), 
-                    article_data.get('image_url'), article_data.get('local_image_path'),
-                    article_data.get('author'), article_data.get('published_date'),
-                    tags_json, article_data.get('success', True)
-                ))
-                cursor.execute('INSERT OR IGNORE INTO processed_urls (url) VALUES (?)', (article_data['url'],))
-                conn.commit()
-                return cursor.lastrowid
-            except sqlite3.IntegrityError:
-                return None
+            for article_data in articles:
+                article_id = self._insert_article(cursor, article_data)
+                article_ids.append(article_id)
+                if article_id:
+                    canonical_urls.append(canonicalize_url(article_data['url']))
+            cursor.executemany(
+                'INSERT OR IGNORE INTO processed_urls (url) VALUES (?)',
+                [(url,) for url in canonical_urls]
+            )
+        if self._seen_index is not None:
+            self._seen_index.update(canonical_urls)
+        return article_ids
+
+    def _insert_article(self, cursor, article_data):
+        domain = urlparse(article_data['url']).netloc
+        # Handle tags which might be a list
+        tags_json = json.dumps(article_data.get('tags', [])) if isinstance(article_data.get('tags'), list) else article_data.get('tags', '[]')
+        published_ts, published_day = normalize_published_date(article_data.get('published_date'))
+        
+        cursor.execute('''
+            INSERT INTO articles (
+                url, domain, title, text, summary, image_url, 
+                local_image_path, author, published_date, tags, success,
+                published_ts, published_day
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO NOTHING
+        ''', (
+            article_data['url'], domain, article_data['title'], 
+            article_data.get('text'), article_data.get('summary'), 
+            article_data.get('image_url'), article_data.get('local_image_path'),
+            article_data.get('author'), article_data.get('published_date'),
+            tags_json, article_data.get('success', True),
+            published_ts, published_day
+        ))
+        return cursor.lastrowid if cursor.rowcount > 0 else None
 
     def mark_as_used(self, article_id):
         with self._get_connection() as conn:
@@ -115,24 +349,76 @@ class Storage:
             conn.commit()
             return cursor.rowcount > 0
 
-    def get_news_list(self, page=1, page_size=10):
-        offset = (page - 1) * page_size
-        today = datetime.now().strftime('%Y-%m-%d')
+    def get_news_list(self, page=1, page_size=10, cursor=None):
+        # Today's unused articles, newest first. "Today" is the server's local day;
+        # it is turned into a UTC timestamp window so the (used, published_day,
+        # published_ts) index serves both the filter and the ordering.
+        # With a cursor (keyset pagination) the page number is ignored.
+        day_start = datetime.now().astimezone().replace(hour=0, minute=0, second=0, microsecond=0)
+        window_start = int(day_start.timestamp())
+        window_end = int((day_start + timedelta(days=1)).timestamp())
+        utc_days = sorted({
+            datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d')
+            for ts in (window_start, window_end - 1)
+        })
+
+        query = f'''
+            SELECT id, title, summary, url, published_date, published_ts FROM articles 
+            WHERE used = 0 AND published_day IN ({', '.join('?' * len(utc_days))})
+              AND published_ts >= ? AND published_ts < ?
+        '''
+        params = [*utc_days, window_start, window_end]
+        if cursor:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            query += ' AND (published_ts < ? OR (published_ts = ? AND id < ?))'
+            params += [cursor_ts, cursor_ts, cursor_id]
+            offset = 0
+        else:
+            offset = (page - 1) * page_size
+        query += ' ORDER BY published_ts DESC, id DESC LIMIT ? OFFSET ?'
+        params += [page_size, offset]
+
         with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            # Filter by today's date and used=False
-            cursor.execute('''
-                SELECT id, title, summary, url, published_date FROM articles 
-                WHERE used = FALSE AND published_date LIKE ?
-                ORDER BY published_date DESC
-                LIMIT ? OFFSET ?
-            ''', (f'{today}%', page_size, offset))
-            return [dict(row) for row in cursor.fetchall()]
+            db_cursor = conn.cursor()
+            db_cursor.execute(query, params)
+            return [dict(row) for row in db_cursor.fetchall()]
+
+    def search_articles(self, query, date_from=None, date_to=None, domain=None, page_size=10, cursor=None):
+        # Full-text search ranked by BM25 (lower score is better), with a highlighted
+        # snippet. date_from/date_to are inclusive UTC days (YYYY-MM-DD).
+        score_sql = f"bm25(articles_fts, {', '.join(str(weight) for weight in SEARCH_WEIGHTS)})"
+        sql = f'''
+            SELECT a.id, a.title, a.url, a.domain, a.published_date,
+                   snippet(articles_fts, -1, '<b>', '</b>', '…', 24) AS snippet,
+                   {score_sql} AS score
+            FROM articles_fts
+            JOIN articles a ON a.id = articles_fts.rowid
+            WHERE articles_fts MATCH ?
+        '''
+        params = [build_match_query(query)]
+        if date_from:
+            sql += ' AND a.published_day >= ?'
+            params.append(_validate_day(date_from))
+        if date_to:
+            sql += ' AND a.published_day <= ?'
+            params.append(_validate_day(date_to))
+        if domain:
+            sql += ' AND a.domain = ?'
+            params.append(domain)
+        if cursor:
+            cursor_score, cursor_id = decode_search_cursor(cursor)
+            sql += f' AND ({score_sql} > ? OR ({score_sql} = ? AND a.id > ?))'
+            params += [cursor_score, cursor_score, cursor_id]
+        sql += ' ORDER BY score, a.id LIMIT ?'
+        params.append(page_size)
+
+        with self._get_connection() as conn:
+            db_cursor = conn.cursor()
+            db_cursor.execute(sql, params)
+            return [dict(row) for row in db_cursor.fetchall()]
 
     def get_article_by_id(self, article_id):
         with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM articles WHERE id = ?', (article_id,))
             row = cursor.fetchone()
@@ -160,13 +446,76 @@ class Storage:
             ))
             conn.commit()
 
+    def get_feed_states(self):
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT url, etag, last_modified, content_hash FROM feed_cache')
+            return {row['url']: dict(row) for row in cursor.fetchall()}
+
+    def save_feed_state(self, feed_state):
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO feed_cache (url, etag, last_modified, content_hash, checked_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    content_hash = excluded.content_hash,
+                    checked_at = excluded.checked_at
+            ''', (
+                feed_state['url'], feed_state.get('etag'),
+                feed_state.get('last_modified'), feed_state.get('content_hash')
+            ))
+            conn.commit()
+
+    def create_scrape_job(self, job_id, status='queued'):
+        with self._get_connection() as conn:
+            conn.execute('INSERT INTO scrape_jobs (id, status) VALUES (?, ?)', (job_id, status))
+
+    def update_scrape_job(self, job_id, **fields):
+        if 'result' in fields and not isinstance(fields['result'], str):
+            fields['result'] = json.dumps(fields['result'], ensure_ascii=False)
+        columns = ', '.join(f'{column} = ?' for column in fields)
+        with self._get_connection() as conn:
+            conn.execute(f'UPDATE scrape_jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+
+    def get_scrape_job(self, job_id):
+        with self._get_connection() as conn:
+            row = conn.execute('SELECT * FROM scrape_jobs WHERE id = ?', (job_id,)).fetchone()
+            if not row:
+                return None
+            data = dict(row)
+            data['result'] = json.loads(data['result']) if data['result'] else None
+            return data
+
+    def get_active_scrape_job(self):
+        with self._get_connection() as conn:
+            row = conn.execute('''
+                SELECT id FROM scrape_jobs WHERE status IN ('queued', 'running')
+                ORDER BY created_at DESC LIMIT 1
+            ''').fetchone()
+            return self.get_scrape_job(row['id']) if row else None
+
+    def fail_stale_scrape_jobs(self, current_job_id):
+        # Called by the run that holds the run lock: any other job still marked as
+        # running belongs to a process that died without finishing
+        with self._get_connection() as conn:
+            conn.execute('''
+                UPDATE scrape_jobs SET status = 'failed', error = 'Interrupted', finished_at = ?
+                WHERE status = 'running' AND id != ?
+            ''', (datetime.now().isoformat(), current_job_id))
+
     def clear_database(self):
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM articles')
             cursor.execute('DELETE FROM processed_urls')
             cursor.execute('DELETE FROM scrape_runs')
+            cursor.execute('DELETE FROM feed_cache')
             conn.commit()
+            if self._seen_index is not None:
+                self._seen_index = set()
             return True
 
     def export_to_json(self, articles, date_str):
@@ -0,0 +1,35 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click and never change the article
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+    'ref', 'ref_src', 'cmpid', 'ns_campaign', 'ns_mchannel', 'ns_source', 'ns_linkname', 'ns_fee'
+}
+TRACKING_PREFIXES = ('utm_', 'at_')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonicalize_url(url):
+    # Normalizes a link so that the same article reached through different
+    # feed/tracking URLs maps to a single key:
+    #   - http and https are treated as the same resource (https)
+    #   - host is lower-cased and default ports are dropped
+    #   - tracking parameters (utm_*, fbclid, ...) and the fragment are removed
+    #   - trailing slashes are dropped from the path
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url.strip()
+
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f'{host}:{parts.port}'
+
+    path = parts.path.rstrip('/')
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ])
+    return urlunsplit(('https', host, path, query, ''))